@@ -5,7 +5,63 @@ Handles reading configuration files and managing settings.
 
 import configparser
 import os
-from typing import Any, Optional, Dict
+from types import SimpleNamespace
+from typing import Any, Optional, Dict, Tuple
+
+
+def _to_bool(value: Any) -> bool:
+    """Convert a config value to bool using configparser's boolean words."""
+    if isinstance(value, bool):
+        return value
+    try:
+        return configparser.ConfigParser.BOOLEAN_STATES[str(value).lower()]
+    except KeyError:
+        raise ValueError(f"Not a boolean: {value}") from None
+
+
+def config_mtime(config_file: str = "config.ini") -> Optional[int]:
+    """Return the config file's modification time in ns, or None if it does not exist."""
+    try:
+        return os.stat(config_file).st_mtime_ns
+    except OSError:
+        return None
+
+
+# Defaults used when no configuration file is present
+_DEFAULT_CONFIG = {
+    'API_KEYS': {
+        'TWITTER_BEARER_TOKEN': 'YOUR_TWITTER_BEARER_TOKEN',
+        'GEMINI_API_KEY': 'YOUR_GEMINI_API_KEY'
+    },
+    'APP_SETTINGS': {
+        'DEFAULT_HASHTAG': '#business',
+        'POST_LIMIT': '10',
+        'SENTIMENT_THRESHOLD': '0.3',
+        'TIMEZONE': 'UTC',
+        'ANALYSIS_DEPTH': 'standard',
+        'ENABLE_RESPONSE_CACHE': 'true'
+    },
+    'FILE_SETTINGS': {
+        'DATA_DIR': 'data',
+        'LOG_RETENTION_DAYS': '30',
+        'EXPORT_FORMAT': 'csv'
+    }
+}
+
+# Typed settings exposed on ConfigManager.settings: key -> (attribute, type, default)
+_SETTINGS_SCHEMA = {
+    'DEFAULT_HASHTAG': ('default_hashtag', str, '#business'),
+    'POST_LIMIT': ('post_limit', int, 10),
+    'SENTIMENT_THRESHOLD': ('sentiment_threshold', float, 0.3),
+    'DATA_DIR': ('data_dir', str, 'data'),
+    'ENABLE_RESPONSE_CACHE': ('enable_response_cache', _to_bool, True),
+}
+
+# API key settings: key -> (attribute, service name used by get_api_key)
+_API_KEY_SCHEMA = {
+    'TWITTER_BEARER_TOKEN': ('twitter_token', 'twitter'),
+    'GEMINI_API_KEY': ('gemini_token', 'gemini'),
+}
 
 
 class ConfigManager:
@@ -20,7 +76,12 @@ class ConfigManager:
         """
         self.config_file = config_file
         self.config = configparser.ConfigParser()
+        self._values: Dict[Tuple[str, str], str] = {}
+        self._flat: Dict[str, str] = {}
+        self._validation: Optional[Dict[str, bool]] = None
         self._load_configuration()
+        self._prefetch_values()
+        self._build_settings()
     
     def _load_configuration(self):
         """Load configuration from file."""
@@ -34,30 +95,43 @@ class ConfigManager:
             self._create_default_config()
     
     def _create_default_config(self):
-        """Create default configuration."""
-        self.config['API_KEYS'] = {
-            'TWITTER_BEARER_TOKEN': 'YOUR_TWITTER_BEARER_TOKEN',
-            'GEMINI_API_KEY': 'YOUR_GEMINI_API_KEY'
-        }
-        
-        self.config['APP_SETTINGS'] = {
-            'DEFAULT_HASHTAG': '#business',
-            'POST_LIMIT': '10',
-            'SENTIMENT_THRESHOLD': '0.3',
-            'TIMEZONE': 'UTC',
-            'ANALYSIS_DEPTH': 'standard'
-        }
-        
-        self.config['FILE_SETTINGS'] = {
-            'DATA_DIR': 'data',
-            'LOG_RETENTION_DAYS': '30',
-            'EXPORT_FORMAT': 'csv'
-        }
-        
-        # Save default config
+        """Populate the in-memory configuration with defaults; nothing is written to disk."""
+        self.config.read_dict(_DEFAULT_CONFIG)
+    
+    def save(self):
+        """Write the current configuration to the config file."""
         with open(self.config_file, 'w') as f:
             self.config.write(f)
     
+    def _prefetch_values(self):
+        """Read every key once into (section, key) and flat section-less lookup maps."""
+        self._values = {}
+        self._flat = {}
+        for sec in (self.config.default_section, *self.config.sections()):
+            for key in self.config[sec]:
+                try:
+                    value = self.config[sec][key]
+                except Exception:
+                    continue
+                self._values[(sec, key)] = value
+                if sec != self.config.default_section:
+                    self._flat.setdefault(key, value)  # First section defining a key wins
+    
+    def _build_settings(self):
+        """Convert known settings to their typed form once, after loading."""
+        values = {}
+        for key, (attr, cast, default) in _SETTINGS_SCHEMA.items():
+            try:
+                values[attr] = cast(self.get(key, default=default))
+            except (TypeError, ValueError):
+                values[attr] = default
+        
+        for key, (attr, _service) in _API_KEY_SCHEMA.items():
+            value = self.get(key, 'API_KEYS')
+            values[attr] = value if value and value != f'YOUR_{key}' else None
+        
+        self.settings = SimpleNamespace(**values)
+    
     def get(self, key: str, section: str = None, default: Any = None) -> Any:
         """
         Get configuration value.
@@ -70,16 +144,11 @@ class ConfigManager:
         Returns:
             Any: Configuration value
         """
-        try:
-            if section:
-                return self.config.get(section, key, fallback=default)
-            else:
-                for sec in self.config.sections():
-                    if key in self.config[sec]:
-                        return self.config[sec][key]
-                return default
-        except Exception:
-            return default
+        option = self.config.optionxform(key)
+        if not section:
+            return self._flat.get(option, default)
+        
+        return self._values.get((section, option), default)
     
     def set(self, key: str, value: Any, section: str = 'APP_SETTINGS'):
         """
@@ -94,9 +163,11 @@ class ConfigManager:
             self.config[section] = {}
         
         self.config[section][key] = str(value)
+        self._prefetch_values()
+        self._build_settings()
+        self._validation = None
         
-        with open(self.config_file, 'w') as f:
-            self.config.write(f)
+        self.save()
     
     def get_api_key(self, service: str) -> Optional[str]:
         """
@@ -108,25 +179,23 @@ class ConfigManager:
         Returns:
             Optional[str]: API key or None
         """
-        key_map = {
-            'twitter': 'TWITTER_BEARER_TOKEN',
-            'gemini': 'GEMINI_API_KEY'
-        }
-        
-        if service.lower() in key_map:
-            key = self.get(key_map[service.lower()], 'API_KEYS')
-            if key and key != f'YOUR_{key_map[service.lower()]}':
-                return key
+        for attr, name in _API_KEY_SCHEMA.values():
+            if service.lower() == name:
+                return getattr(self.settings, attr)
         
         return None
     
     def validate_configuration(self) -> Dict[str, bool]:
         """Validate configuration and return status."""
-        validation = {
-            'config_file_exists': os.path.exists(self.config_file),
-            'twitter_api_configured': self.get_api_key('twitter') is not None,
-            'gemini_api_configured': self.get_api_key('gemini') is not None,
-            'data_dir_exists': os.path.exists(self.get('DATA_DIR', 'FILE_SETTINGS', 'data'))
-        }
+        # The loaded config changes only through set(), which clears this;
+        # the data directory can change independently, so it is always re-checked
+        if self._validation is None:
+            self._validation = {
+                'config_file_exists': bool(self.config.sections()),
+                'twitter_api_configured': self.get_api_key('twitter') is not None,
+                'gemini_api_configured': self.get_api_key('gemini') is not None
+            }
         
+        validation = dict(self._validation)
+        validation['data_dir_exists'] = os.path.exists(self.settings.data_dir)
         return validation
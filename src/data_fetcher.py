@@ -3,16 +3,60 @@ Module for fetching data from Twitter/X API.
 Handles API interactions and data preprocessing.
 """
 
-import tweepy
-import pandas as pd
 from datetime import datetime, timedelta
+from functools import lru_cache
 import re
-from typing import List, Dict, Optional
+import time
+from typing import List, Dict, Optional, Tuple
+
+import numpy as np
+
+
+# URLs, mentions and hashtag symbols, removed in a single pass
+_URL_MENTION_HASH_RE = re.compile(r'https?://\S+|www\.\S+|@\w+|#')
+
+
+@lru_cache(maxsize=1)
+def _sample_trends(minute: int) -> Tuple[Dict, ...]:
+    """Build the sample trend tweets; cached per minute bucket."""
+    now = datetime.now()
+    return (
+        {
+            'text': "Business innovation is accelerating with AI integration across industries.",
+            'created_at': (now - timedelta(hours=1)).isoformat(),
+            'engagement_score': 85.5,
+            'likes': 45,
+            'retweets': 12
+        },
+        {
+            'text': "Sustainability practices are becoming a competitive advantage for businesses.",
+            'created_at': (now - timedelta(hours=2)).isoformat(),
+            'engagement_score': 72.3,
+            'likes': 38,
+            'retweets': 8
+        },
+        {
+            'text': "Remote work challenges include maintaining team cohesion and productivity.",
+            'created_at': (now - timedelta(hours=3)).isoformat(),
+            'engagement_score': 61.2,
+            'likes': 29,
+            'retweets': 5
+        }
+    )
 
 
 class TwitterDataFetcher:
     """Handles fetching and preprocessing Twitter data."""
     
+    # Engagement score weight per public metric, in metric column order
+    _WEIGHTS = (
+        ('like_count', 0.4),
+        ('retweet_count', 0.3),
+        ('reply_count', 0.2),
+        ('quote_count', 0.1)
+    )
+    _WEIGHT_VECTOR = np.array([weight for _, weight in _WEIGHTS])
+    
     def __init__(self, config):
         """
         Initialize Twitter client.
@@ -26,8 +70,10 @@ class TwitterDataFetcher:
     def _initialize_client(self):
         """Initialize and return Twitter API client."""
         try:
-            bearer_token = self.config.get('TWITTER_BEARER_TOKEN')
-            if bearer_token and bearer_token != 'YOUR_TWITTER_BEARER_TOKEN':
+            bearer_token = self.config.settings.twitter_token
+            if bearer_token:
+                # Imported here so demo mode (no API key) never loads tweepy
+                import tweepy
                 return tweepy.Client(bearer_token=bearer_token)
             return None
         except Exception as e:
@@ -73,80 +119,49 @@ class TwitterDataFetcher:
     
     def _process_tweets(self, tweets, includes=None) -> List[Dict]:
         """Process raw tweet data into structured format."""
-        processed_tweets = []
-        
-        # Create user map if includes provided
+        # Create username map if includes provided
         user_map = {}
         if includes and 'users' in includes:
-            user_map = {user.id: user for user in includes['users']}
+            user_map = {user.id: user.username for user in includes['users']}
         
+        # Collect per-tweet fields and metric columns in a single pass
+        ids, texts, created, usernames, metric_rows = [], [], [], [], []
         for tweet in tweets:
-            # Get user info
-            username = "Unknown"
-            if tweet.author_id in user_map:
-                username = user_map[tweet.author_id].username
-            
-            # Clean text
-            clean_text = self._clean_tweet_text(tweet.text)
-            
-            # Calculate engagement score
             metrics = tweet.public_metrics
-            engagement_score = (
-                metrics.get('like_count', 0) * 0.4 +
-                metrics.get('retweet_count', 0) * 0.3 +
-                metrics.get('reply_count', 0) * 0.2 +
-                metrics.get('quote_count', 0) * 0.1
-            )
-            
-            processed_tweets.append({
-                'id': tweet.id,
-                'text': clean_text,
-                'created_at': tweet.created_at.isoformat() if tweet.created_at else None,
+            ids.append(tweet.id)
+            texts.append(self._clean_tweet_text(tweet.text))
+            created.append(tweet.created_at.isoformat() if tweet.created_at else None)
+            usernames.append(user_map.get(tweet.author_id, "Unknown"))
+            metric_rows.append(tuple(metrics.get(name, 0) for name, _ in self._WEIGHTS))
+        
+        # Calculate engagement scores for all tweets at once
+        counts = np.asarray(metric_rows, dtype=np.float64).reshape(len(metric_rows), len(self._WEIGHTS))
+        engagement_scores = (counts @ self._WEIGHT_VECTOR).tolist()
+        
+        return [
+            {
+                'id': tweet_id,
+                'text': text,
+                'created_at': created_at,
                 'username': username,
-                'likes': metrics.get('like_count', 0),
-                'retweets': metrics.get('retweet_count', 0),
-                'replies': metrics.get('reply_count', 0),
+                'likes': like_count,
+                'retweets': retweet_count,
+                'replies': reply_count,
                 'engagement_score': engagement_score,
-                'url': f"https://twitter.com/{username}/status/{tweet.id}"
-            })
-        
-        return processed_tweets
+                'url': f"https://twitter.com/{username}/status/{tweet_id}"
+            }
+            for tweet_id, text, created_at, username, (like_count, retweet_count, reply_count, _), engagement_score
+            in zip(ids, texts, created, usernames, metric_rows, engagement_scores)
+        ]
     
     def _clean_tweet_text(self, text: str) -> str:
         """Clean tweet text by removing URLs, mentions, and extra spaces."""
-        # Remove URLs
-        text = re.sub(r'https?://\S+|www\.\S+', '', text)
-        # Remove mentions
-        text = re.sub(r'@\w+', '', text)
-        # Remove hashtag symbols but keep text
-        text = re.sub(r'#', '', text)
+        # Remove URLs, mentions and hashtag symbols (keeping hashtag text)
+        text = _URL_MENTION_HASH_RE.sub('', text)
         # Remove extra whitespace
-        text = ' '.join(text.split())
-        return text.strip()
+        return ' '.join(text.split())
     
     def fetch_sample_trends(self) -> List[Dict]:
         """Return sample trend data for testing/demo purposes."""
-        sample_tweets = [
-            {
-                'text': "Business innovation is accelerating with AI integration across industries.",
-                'created_at': (datetime.now() - timedelta(hours=1)).isoformat(),
-                'engagement_score': 85.5,
-                'likes': 45,
-                'retweets': 12
-            },
-            {
-                'text': "Sustainability practices are becoming a competitive advantage for businesses.",
-                'created_at': (datetime.now() - timedelta(hours=2)).isoformat(),
-                'engagement_score': 72.3,
-                'likes': 38,
-                'retweets': 8
-            },
-            {
-                'text': "Remote work challenges include maintaining team cohesion and productivity.",
-                'created_at': (datetime.now() - timedelta(hours=3)).isoformat(),
-                'engagement_score': 61.2,
-                'likes': 29,
-                'retweets': 5
-            }
-        ]
-        return sample_tweets
+        # Timestamps refresh once per minute rather than on every call
+        return [dict(t) for t in _sample_trends(int(time.time() // 60))]
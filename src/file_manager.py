@@ -3,11 +3,116 @@ Module for handling file operations including reading, writing, and data managem
 """
 
 import csv
+import io
 import json
 import os
+import threading
+import time
 from datetime import datetime, timedelta  # FIXED: Added timedelta import
-from typing import List, Dict, Any
-import pandas as pd
+from functools import lru_cache
+from typing import List, Dict, Any, IO, Tuple
+
+try:
+    import orjson
+except ImportError:  # Optional; falls back to the stdlib json module
+    orjson = None
+
+
+@lru_cache(maxsize=1)
+def _sample_tweets(minute: int) -> Tuple[Dict, ...]:
+    """Build the demonstration tweets; cached per minute bucket."""
+    now = datetime.now()
+    return (
+        {
+            'text': "Digital transformation is essential for business survival in 2024.",
+            'created_at': now.isoformat(),
+            'engagement_score': 85.5,
+            'likes': 42,
+            'retweets': 15
+        },
+        {
+            'text': "Sustainability reporting is becoming mandatory for large corporations.",
+            'created_at': (now - timedelta(hours=2)).isoformat(),
+            'engagement_score': 72.3,
+            'likes': 38,
+            'retweets': 9
+        },
+        {
+            'text': "AI tools are helping small businesses compete with larger enterprises.",
+            'created_at': (now - timedelta(hours=4)).isoformat(),
+            'engagement_score': 91.2,
+            'likes': 56,
+            'retweets': 21
+        },
+        {
+            'text': "Supply chain disruptions continue to affect global business operations.",
+            'created_at': (now - timedelta(hours=6)).isoformat(),
+            'engagement_score': 64.7,
+            'likes': 31,
+            'retweets': 7
+        }
+    )
+
+
+# Timestamp formats for result file names and the schedule text footer
+_TIMESTAMP_FMT = "%Y%m%d_%H%M%S"
+_GENERATED_FMT = "%Y-%m-%d %H:%M"
+
+# Hours and per-day patterns used for the generated default history
+_DEFAULT_HISTORY_HOURS = (9, 11, 14, 16, 19)
+_WEEKLY_ENGAGEMENT = tuple(0.5 + (0.3 * i / 7) for i in range(7))
+_SENTIMENT_CYCLE = tuple(0.1 * i - 0.2 for i in range(5))
+
+# Columns of the engagement history CSV in file order; extra keys follow them
+_HISTORY_FIELDS = ('timestamp', 'day_of_week', 'hour_of_day', 'estimated_engagement', 'sentiment_score')
+
+# Types of the numeric engagement history columns; other columns stay strings
+_HISTORY_COLUMN_TYPES = {
+    'day_of_week': int,
+    'hour_of_day': int,
+    'estimated_engagement': float,
+    'sentiment_score': float
+}
+
+# Columns of the master analysis log
+_LOG_FIELDS = ('timestamp', 'hashtag', 'tweets_analyzed', 'overall_sentiment', 'top_recommendation')
+
+# Open analysis logs shared by every FileManager, keyed by absolute path
+_LOG_WRITERS: Dict[str, Tuple[IO[str], csv.DictWriter]] = {}
+_LOG_LOCK = threading.Lock()
+
+
+def _fieldnames(rows: List[Dict], first: Tuple[str, ...] = ()) -> List[str]:
+    """Return the names in first, then the remaining row keys in first-seen order."""
+    names = dict.fromkeys(first)
+    names.update(dict.fromkeys(key for row in rows for key in row))
+    return list(names)
+
+
+def _open_log(log_file: str) -> Tuple[IO[str], csv.DictWriter]:
+    """Return the shared (handle, writer) for an analysis log; the caller holds _LOG_LOCK."""
+    entry = _LOG_WRITERS.get(log_file)
+    if entry is None:
+        file_exists = os.path.exists(log_file)
+        
+        fh = open(log_file, 'a', newline='')
+        writer = csv.DictWriter(fh, fieldnames=_LOG_FIELDS)
+        if not file_exists:
+            writer.writeheader()
+            fh.flush()
+        entry = _LOG_WRITERS[log_file] = (fh, writer)
+    
+    return entry
+
+
+def _parse_history_row(row: Dict[str, str]) -> Dict[str, Any]:
+    """Convert the numeric columns of an engagement history CSV row; blank cells become None."""
+    parsed = dict(row)
+    for key, cast in _HISTORY_COLUMN_TYPES.items():
+        if key in parsed:
+            value = parsed[key]
+            parsed[key] = cast(value) if value else None
+    return parsed
 
 
 class FileManager:
@@ -21,6 +126,8 @@ class FileManager:
             data_dir (str): Directory for data files
         """
         self.data_dir = data_dir
+        self.history_file = os.path.join(data_dir, "engagement_history.csv")
+        self.log_file = os.path.abspath(os.path.join(data_dir, "analysis_log.csv"))
         self._ensure_data_directory()
     
     def _ensure_data_directory(self):
@@ -30,12 +137,10 @@ class FileManager:
     
     def load_engagement_history(self) -> List[Dict]:
         """Load engagement history from CSV file."""
-        history_file = os.path.join(self.data_dir, "engagement_history.csv")
-        
-        if os.path.exists(history_file):
+        if os.path.exists(self.history_file):
             try:
-                df = pd.read_csv(history_file)
-                return df.to_dict('records')
+                with open(self.history_file, newline='') as f:
+                    return [_parse_history_row(row) for row in csv.DictReader(f)]
             except Exception as e:
                 print(f"Error loading engagement history: {e}")
         
@@ -44,39 +149,67 @@ class FileManager:
     
     def _create_default_history(self) -> List[Dict]:
         """Create default engagement history."""
-        default_history = []
         base_date = datetime.now() - timedelta(days=30)
+        days = [(i, base_date + timedelta(days=i)) for i in range(30)]
         
-        for i in range(30):
-            date = base_date + timedelta(days=i)
-            for hour in [9, 11, 14, 16, 19]:  # Sample hours
-                default_history.append({
-                    'timestamp': date.replace(hour=hour).isoformat(),
-                    'day_of_week': date.weekday(),
-                    'hour_of_day': hour,
-                    'estimated_engagement': 0.5 + (0.3 * (i % 7) / 7),  # Weekly pattern
-                    'sentiment_score': 0.1 * (i % 5) - 0.2  # Varying sentiment
-                })
-        
-        return default_history
+        return [
+            {
+                'timestamp': date.replace(hour=hour).isoformat(),
+                'day_of_week': date.weekday(),
+                'hour_of_day': hour,
+                'estimated_engagement': _WEEKLY_ENGAGEMENT[i % 7],  # Weekly pattern
+                'sentiment_score': _SENTIMENT_CYCLE[i % 5]  # Varying sentiment
+            }
+            for i, date in days
+            for hour in _DEFAULT_HISTORY_HOURS
+        ]
     
     def save_engagement_history(self, history: List[Dict]):
-        """Save engagement history to CSV file."""
+        """Save (rewrite) the full engagement history to CSV file."""
         try:
-            history_file = os.path.join(self.data_dir, "engagement_history.csv")
-            df = pd.DataFrame(history)
-            df.to_csv(history_file, index=False)
+            with open(self.history_file, 'w', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=_fieldnames(history, _HISTORY_FIELDS), restval='')
+                writer.writeheader()
+                writer.writerows(history)
         except Exception as e:
             print(f"Error saving engagement history: {e}")
     
-    def save_analysis_results(self, results: Dict[str, Any]):
-        """Save analysis results to JSON file."""
+    def append_engagement_row(self, row: Dict[str, Any]):
+        """Append a single entry to an existing engagement history CSV file."""
+        try:
+            with open(self.history_file, 'a+', newline='') as f:
+                # Write the row under the file's own header, whatever its column order
+                f.seek(0)
+                header = next(csv.reader(f), None)
+                f.seek(0, os.SEEK_END)
+                
+                writer = csv.DictWriter(f, fieldnames=header or _HISTORY_FIELDS,
+                                        restval='', extrasaction='ignore')
+                if not header:
+                    writer.writeheader()
+                writer.writerow(row)
+                
+        except Exception as e:
+            print(f"Error appending to engagement history: {e}")
+    
+    def save_analysis_results(self, results: Dict[str, Any], now: datetime = None):
+        """
+        Save analysis results to JSON file.
+        
+        Args:
+            results (Dict[str, Any]): Analysis results to save
+            now (datetime): Time of the analysis; defaults to the current time
+        """
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = (now or datetime.now()).strftime(_TIMESTAMP_FMT)
             results_file = os.path.join(self.data_dir, f"analysis_{timestamp}.json")
             
-            with open(results_file, 'w') as f:
-                json.dump(results, f, indent=2)
+            if orjson is not None:
+                with open(results_file, 'wb') as f:
+                    f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+            else:
+                with open(results_file, 'w') as f:
+                    json.dump(results, f, indent=2)
             
             # Also append to master log
             self._append_to_analysis_log(results)
@@ -87,61 +220,36 @@ class FileManager:
     def _append_to_analysis_log(self, results: Dict[str, Any]):
         """Append analysis to master log CSV."""
         try:
-            log_file = os.path.join(self.data_dir, "analysis_log.csv")
-            
             # Prepare row for CSV
             row = {
                 'timestamp': results.get('timestamp', datetime.now().isoformat()),
                 'hashtag': results.get('hashtag', 'unknown'),
-                'tweets_analyzed': len(results.get('sentiment_results', {}).get('tweets_analyzed', 0)),
+                'tweets_analyzed': results.get('sentiment_results', {}).get('tweets_analyzed', 0),
                 'overall_sentiment': results.get('sentiment_results', {}).get('overall_sentiment', 0),
                 'top_recommendation': results.get('optimal_times', [{}])[0].get('time', '') if results.get('optimal_times') else ''
             }
             
-            # Write to CSV
-            file_exists = os.path.exists(log_file)
-            
-            with open(log_file, 'a', newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=row.keys())
-                if not file_exists:
-                    writer.writeheader()
+            # The log stays open between analyses and is shared with other
+            # instances; flush so each row reaches disk
+            with _LOG_LOCK:
+                fh, writer = _open_log(self.log_file)
                 writer.writerow(row)
+                fh.flush()
                 
         except Exception as e:
             print(f"Error appending to analysis log: {e}")
     
+    def close(self):
+        """Close the analysis log if it is open."""
+        with _LOG_LOCK:
+            entry = _LOG_WRITERS.pop(self.log_file, None)
+        if entry is not None:
+            entry[0].close()
+    
     def load_sample_data(self) -> List[Dict]:
         """Load sample data for demonstration purposes."""
-        return [
-            {
-                'text': "Digital transformation is essential for business survival in 2024.",
-                'created_at': datetime.now().isoformat(),
-                'engagement_score': 85.5,
-                'likes': 42,
-                'retweets': 15
-            },
-            {
-                'text': "Sustainability reporting is becoming mandatory for large corporations.",
-                'created_at': (datetime.now() - timedelta(hours=2)).isoformat(),
-                'engagement_score': 72.3,
-                'likes': 38,
-                'retweets': 9
-            },
-            {
-                'text': "AI tools are helping small businesses compete with larger enterprises.",
-                'created_at': (datetime.now() - timedelta(hours=4)).isoformat(),
-                'engagement_score': 91.2,
-                'likes': 56,
-                'retweets': 21
-            },
-            {
-                'text': "Supply chain disruptions continue to affect global business operations.",
-                'created_at': (datetime.now() - timedelta(hours=6)).isoformat(),
-                'engagement_score': 64.7,
-                'likes': 31,
-                'retweets': 7
-            }
-        ]
+        # Timestamps refresh once per minute rather than on every call
+        return [dict(t) for t in _sample_tweets(int(time.time() // 60))]
     
     def export_to_csv(self, results: Dict[str, Any]) -> str:
         """Export results to CSV format string."""
@@ -177,8 +285,12 @@ class FileManager:
                 })
             
             # Convert to CSV string
-            df = pd.DataFrame(export_data)
-            return df.to_csv(index=False)
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=_fieldnames(export_data),
+                                    restval='', lineterminator='\n')
+            writer.writeheader()
+            writer.writerows(export_data)
+            return buffer.getvalue()
             
         except Exception as e:
             print(f"Error exporting to CSV: {e}")
@@ -187,31 +299,30 @@ class FileManager:
     def format_schedule_text(self, results: Dict[str, Any]) -> str:
         """Format posting schedule as text for copying."""
         try:
-            text = "📅 POSTING SCHEDULE RECOMMENDATIONS\n"
-            text += "=" * 40 + "\n\n"
+            parts = ["📅 POSTING SCHEDULE RECOMMENDATIONS\n", "=" * 40 + "\n\n"]
             
-            text += "📊 SENTIMENT ANALYSIS SUMMARY\n"
-            text += "-" * 30 + "\n"
+            parts.append("📊 SENTIMENT ANALYSIS SUMMARY\n")
+            parts.append("-" * 30 + "\n")
             sentiment = results.get('sentiment_results', {})
-            text += f"Overall Sentiment: {sentiment.get('overall_sentiment', 0):.2f}\n"
-            text += f"Tweets Analyzed: {results.get('tweets_analyzed', 0)}\n\n"
+            parts.append(f"Overall Sentiment: {sentiment.get('overall_sentiment', 0):.2f}\n")
+            parts.append(f"Tweets Analyzed: {results.get('tweets_analyzed', 0)}\n\n")
             
-            text += "⏰ OPTIMAL POSTING TIMES\n"
-            text += "-" * 30 + "\n"
+            parts.append("⏰ OPTIMAL POSTING TIMES\n")
+            parts.append("-" * 30 + "\n")
             for i, slot in enumerate(results.get('optimal_times', []), 1):
-                text += f"{i}. {slot.get('day')} {slot.get('time')}\n"
-                text += f"   Engagement Score: {slot.get('score'):.3f}\n"
-                text += f"   {slot.get('recommendation', '')}\n\n"
+                parts.append(f"{i}. {slot.get('day')} {slot.get('time')}\n")
+                parts.append(f"   Engagement Score: {slot.get('score'):.3f}\n")
+                parts.append(f"   {slot.get('recommendation', '')}\n\n")
             
-            text += "💡 CONTENT SUGGESTIONS\n"
-            text += "-" * 30 + "\n"
+            parts.append("💡 CONTENT SUGGESTIONS\n")
+            parts.append("-" * 30 + "\n")
             for i, idea in enumerate(results.get('content_suggestions', []), 1):
-                text += f"{i}. {idea}\n"
+                parts.append(f"{i}. {idea}\n")
             
-            text += "\n" + "=" * 40 + "\n"
-            text += f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}\n"
+            parts.append("\n" + "=" * 40 + "\n")
+            parts.append(f"Generated: {datetime.now().strftime(_GENERATED_FMT)}\n")
             
-            return text
+            return ''.join(parts)
             
         except Exception as e:
             return f"Error formatting schedule: {str(e)}"
@@ -6,17 +6,47 @@ This module coordinates all components of the application.
 
 import sys
 import os
+import random
+import threading
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.data_fetcher import TwitterDataFetcher
-from src.sentiment_analyzer import SentimentAnalyzer
 from src.scheduler import PostingScheduler
 from src.file_manager import FileManager
-from src.config import ConfigManager
+from src.config import ConfigManager, config_mtime
 import streamlit as st
-import pandas as pd
 from datetime import datetime
-import matplotlib.pyplot as plt
+from functools import cached_property
+from typing import Optional
+
+
+# Static demonstration results; callers treat this as read-only
+_DEMO_DATA_TEMPLATE = {
+    'tweets_analyzed': 8,
+    'sentiment_results': {
+        'overall_sentiment': 0.65,
+        'positive_topics': ['innovation', 'growth', 'strategy'],
+        'negative_topics': ['competition', 'challenges'],
+        'sentiment_distribution': {'positive': 0.6, 'neutral': 0.3, 'negative': 0.1}
+    },
+    'optimal_times': [
+        {'day': 'Tuesday', 'time': '10:00-11:00', 'score': 0.85},
+        {'day': 'Wednesday', 'time': '14:00-15:00', 'score': 0.78},
+        {'day': 'Friday', 'time': '09:00-10:00', 'score': 0.72}
+    ],
+    'content_suggestions': [
+        "Share insights about business innovation trends",
+        "Post about growth strategies for SMEs",
+        "Discuss overcoming common business challenges"
+    ],
+    'tweets_sample': [
+        "Business innovation is key to staying competitive in today's market.",
+        "Growing a business requires both strategy and adaptability.",
+        "Challenges are opportunities in disguise for resilient entrepreneurs."
+    ]
+}
+
+# Range of the "Number of posts to analyze" slider
+_POST_LIMIT_RANGE = (5, 50)
 
 
 class SocialMediaAssistant:
@@ -24,14 +54,22 @@ class SocialMediaAssistant:
     
     def __init__(self):
         """Initialize all components of the application."""
+        # Deferred so importing this module stays cheap on Streamlit cold start
+        from src.data_fetcher import TwitterDataFetcher
+        from src.sentiment_analyzer import SentimentAnalyzer
+        
         self.config = ConfigManager()
         self.data_fetcher = TwitterDataFetcher(self.config)
         self.analyzer = SentimentAnalyzer(self.config)
         self.scheduler = PostingScheduler()
         self.file_manager = FileManager()
-        
-        # Load or create engagement history
-        self.engagement_history = self.file_manager.load_engagement_history()
+        # One cached instance serves every session, so analysis runs are serialized
+        self._lock = threading.Lock()
+    
+    @cached_property
+    def engagement_history(self):
+        """Engagement history, loaded or created on first use."""
+        return self.file_manager.load_engagement_history()
         
     def run_analysis(self, hashtag=None, post_limit=None):
         """
@@ -44,47 +82,59 @@ class SocialMediaAssistant:
         Returns:
             dict: Analysis results including sentiment, optimal times, and content suggestions
         """
+        with self._lock:
+            return self._run_analysis(hashtag, post_limit)
+    
+    def _run_analysis(self, hashtag, post_limit):
+        """Run the analysis pipeline; the caller holds self._lock."""
+        # Single timestamp shared by everything this run records
+        now = datetime.now()
+        
         try:
-            # Step 1: Fetch data
-            st.info("🔄 Fetching trending posts...")
-            tweets = self.data_fetcher.fetch_trending_posts(
-                hashtag=hashtag,
-                post_limit=post_limit or self.config.get('POST_LIMIT', 10)
-            )
-            
-            if not tweets:
-                st.warning("No tweets found. Using sample data for demonstration.")
-                tweets = self.file_manager.load_sample_data()
-            
-            # Step 2: Analyze sentiment
-            st.info("🔍 Analyzing sentiment...")
-            sentiment_results = self.analyzer.analyze_sentiment_batch(tweets)
-            
-            # Step 3: Determine optimal posting times
-            st.info("⏰ Calculating optimal posting schedule...")
-            optimal_times = self.scheduler.calculate_optimal_times(
-                sentiment_results,
-                self.engagement_history
-            )
-            
-            # Step 4: Generate content suggestions
-            st.info("💡 Generating content ideas...")
-            content_suggestions = self.analyzer.generate_content_ideas(
-                sentiment_results,
-                hashtag or self.config.get('DEFAULT_HASHTAG', '#business')
-            )
-            
-            # Step 5: Save results
-            self.file_manager.save_analysis_results({
-                'timestamp': datetime.now().isoformat(),
-                'hashtag': hashtag,
-                'sentiment_results': sentiment_results,
-                'optimal_times': optimal_times,
-                'content_suggestions': content_suggestions
-            })
-            
-            # Step 6: Update engagement history (simulated)
-            self._simulate_engagement_update(optimal_times)
+            # Progress is reported through a single status container updated in place
+            with st.status("Running analysis...", expanded=True) as status:
+                # Step 1: Fetch data
+                status.update(label="🔄 Fetching trending posts...")
+                tweets = self.data_fetcher.fetch_trending_posts(
+                    hashtag=hashtag,
+                    post_limit=post_limit or self.config.settings.post_limit
+                )
+                
+                if not tweets:
+                    st.warning("No tweets found. Using sample data for demonstration.")
+                    tweets = self.file_manager.load_sample_data()
+                
+                # Step 2: Analyze sentiment
+                status.update(label="🔍 Analyzing sentiment...")
+                sentiment_results = self.analyzer.analyze_sentiment_batch(tweets)
+                
+                # Step 3: Determine optimal posting times
+                status.update(label="⏰ Calculating optimal posting schedule...")
+                optimal_times = self.scheduler.calculate_optimal_times(
+                    sentiment_results,
+                    self.engagement_history
+                )
+                
+                # Step 4: Generate content suggestions
+                status.update(label="💡 Generating content ideas...")
+                content_suggestions = self.analyzer.generate_content_ideas(
+                    sentiment_results,
+                    hashtag or self.config.settings.default_hashtag
+                )
+                
+                # Step 5: Save results
+                self.file_manager.save_analysis_results({
+                    'timestamp': now.isoformat(),
+                    'hashtag': hashtag,
+                    'sentiment_results': sentiment_results,
+                    'optimal_times': optimal_times,
+                    'content_suggestions': content_suggestions
+                }, now=now)
+                
+                # Step 6: Update engagement history (simulated)
+                self._simulate_engagement_update(optimal_times, now=now)
+                
+                status.update(label="✅ Analysis complete", state="complete")
             
             return {
                 'tweets_analyzed': len(tweets),
@@ -99,47 +149,35 @@ class SocialMediaAssistant:
             # Return demo data for testing
             return self._get_demo_data()
     
-    def _simulate_engagement_update(self, optimal_times):
+    def _simulate_engagement_update(self, optimal_times, now=None):
         """Simulate updating engagement history with new data."""
         # In a real application, this would track actual engagement
         # For this project, we'll simulate some data
-        import random
+        now = now or datetime.now()
         new_entry = {
-            'timestamp': datetime.now().isoformat(),
-            'day_of_week': datetime.now().weekday(),
-            'hour_of_day': datetime.now().hour,
-            'estimated_engagement': random.uniform(0.5, 1.0),
-            'sentiment_score': random.uniform(-0.5, 0.5)
+            'timestamp': now.isoformat(),
+            'day_of_week': now.weekday(),
+            'hour_of_day': now.hour,
+            'estimated_engagement': random.random() * 0.5 + 0.5,  # uniform in [0.5, 1.0)
+            'sentiment_score': random.random() - 0.5  # uniform in [-0.5, 0.5)
         }
         self.engagement_history.append(new_entry)
-        self.file_manager.save_engagement_history(self.engagement_history)
+        
+        if os.path.exists(self.file_manager.history_file):
+            self.file_manager.append_engagement_row(new_entry)
+        else:
+            # First save also persists the generated default history
+            self.file_manager.save_engagement_history(self.engagement_history)
     
     def _get_demo_data(self):
         """Return demonstration data for testing without API keys."""
-        return {
-            'tweets_analyzed': 8,
-            'sentiment_results': {
-                'overall_sentiment': 0.65,
-                'positive_topics': ['innovation', 'growth', 'strategy'],
-                'negative_topics': ['competition', 'challenges'],
-                'sentiment_distribution': {'positive': 0.6, 'neutral': 0.3, 'negative': 0.1}
-            },
-            'optimal_times': [
-                {'day': 'Tuesday', 'time': '10:00-11:00', 'score': 0.85},
-                {'day': 'Wednesday', 'time': '14:00-15:00', 'score': 0.78},
-                {'day': 'Friday', 'time': '09:00-10:00', 'score': 0.72}
-            ],
-            'content_suggestions': [
-                "Share insights about business innovation trends",
-                "Post about growth strategies for SMEs",
-                "Discuss overcoming common business challenges"
-            ],
-            'tweets_sample': [
-                "Business innovation is key to staying competitive in today's market.",
-                "Growing a business requires both strategy and adaptability.",
-                "Challenges are opportunities in disguise for resilient entrepreneurs."
-            ]
-        }
+        return _DEMO_DATA_TEMPLATE
+
+
+@st.cache_resource(max_entries=1)
+def _get_assistant(config_version: Optional[int]):
+    """Build the assistant once per config file version and reuse it across Streamlit reruns."""
+    return SocialMediaAssistant()
 
 
 def create_streamlit_app():
@@ -156,8 +194,8 @@ def create_streamlit_app():
     It helps businesses maximize engagement on social media platforms.
     """)
     
-    # Initialize assistant
-    assistant = SocialMediaAssistant()
+    # Initialize assistant (cached across reruns, rebuilt when config.ini changes)
+    assistant = _get_assistant(config_mtime())
     
     # Sidebar for inputs
     with st.sidebar:
@@ -165,14 +203,16 @@ def create_streamlit_app():
         
         hashtag = st.text_input(
             "Enter hashtag or keyword:",
-            value=assistant.config.get('DEFAULT_HASHTAG', '#business')
+            value=assistant.config.settings.default_hashtag
         )
         
+        # POST_LIMIT may be outside the slider range, which Streamlit rejects
+        min_posts, max_posts = _POST_LIMIT_RANGE
         post_limit = st.slider(
             "Number of posts to analyze:",
-            min_value=5,
-            max_value=50,
-            value=assistant.config.get('POST_LIMIT', 10)
+            min_value=min_posts,
+            max_value=max_posts,
+            value=min(max(assistant.config.settings.post_limit, min_posts), max_posts)
         )
         
         analyze_button = st.button("🚀 Analyze & Generate Schedule", type="primary")
@@ -182,6 +222,8 @@ def create_streamlit_app():
     
     # Main content area
     if analyze_button:
+        import pandas as pd
+        
         with st.spinner("Analyzing trends and generating recommendations..."):
             results = assistant.run_analysis(hashtag, post_limit)
         
@@ -215,6 +257,8 @@ def create_streamlit_app():
             st.dataframe(times_df, use_container_width=True)
             
             # Visualize schedule
+            import matplotlib.pyplot as plt
+            
             fig, ax = plt.subplots(figsize=(10, 4))
             times_df['score_num'] = times_df['score'] * 100
             ax.bar(range(len(times_df)), times_df['score_num'])
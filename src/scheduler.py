@@ -2,22 +2,62 @@
 Module for calculating optimal posting times based on sentiment and engagement data.
 """
 
+import logging
 from datetime import datetime, timedelta
-import pandas as pd
-from typing import List, Dict, Any
-import random
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Values that mark a missing history field (None after CSV loading, '' if unparsed)
+_BLANK = (None, '')
+
+
+def _current_hour() -> int:
+    """Hour of day (0-23) in local time."""
+    return datetime.now().hour
 
 
 class PostingScheduler:
     """Calculates optimal posting times based on analysis results."""
     
+    __slots__ = ('base', 'days', 'time_ranges', '_rng')
+    
+    # Score thresholds and the recommendation text for each band between them
+    _THRESHOLDS = np.array([0.6, 0.7, 0.8])
+    _TEXTS = (
+        "Lower priority - consider other time slots first",
+        "Moderate time - average engagement expected",
+        "Good time to post - above average engagement expected",
+        "Excellent time to post - high expected engagement"
+    )
+    
+    # (base, days, time_ranges) slot arrays shared by all instances, built on first use
+    _SLOTS: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+    
     def __init__(self):
         """Initialize scheduler with default time slots."""
-        self.time_slots = self._initialize_time_slots()
+        self.base, self.days, self.time_ranges = self._get_slots()
+        self._rng = np.random.default_rng()
     
-    def _initialize_time_slots(self) -> List[Dict]:
-        """Initialize default time slots with base engagement scores."""
-        slots = []
+    @classmethod
+    def _get_slots(cls) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return the shared slot arrays, building them once per process."""
+        if cls._SLOTS is None:
+            cls._SLOTS = cls._initialize_time_slots()
+        return cls._SLOTS
+    
+    @staticmethod
+    def _initialize_time_slots() -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Initialize default time slots as parallel arrays.
+        
+        Returns:
+            Tuple of base engagement scores, day names and time ranges, all
+            indexed by slot
+        """
+        slot_days, slot_ranges, base_scores = [], [], []
         
         # Define days and time ranges
         days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
@@ -33,20 +73,25 @@ class PostingScheduler:
         # Create slots
         for day in days:
             for start, end in time_ranges:
+                slot_days.append(day)
+                slot_ranges.append(f"{start}-{end}")
                 # Base engagement varies by day and time
-                base_score = self._calculate_base_score(day, start)
-                
-                slots.append({
-                    'day': day,
-                    'time_range': f"{start}-{end}",
-                    'start_hour': int(start.split(':')[0]),
-                    'base_engagement': base_score,
-                    'sentiment_adjustment': 0.0
-                })
+                base_scores.append(PostingScheduler._calculate_base_score(day, start))
+        
+        slots = (
+            np.array(base_scores, dtype=np.float32),
+            np.array(slot_days),
+            np.array(slot_ranges)
+        )
+        
+        # Slot data is shared by every call and instance; scores are computed into local arrays
+        for arr in slots:
+            arr.setflags(write=False)
         
         return slots
     
-    def _calculate_base_score(self, day: str, start_time: str) -> float:
+    @staticmethod
+    def _calculate_base_score(day: str, start_time: str) -> float:
         """Calculate base engagement score for a time slot."""
         # Business days typically have higher engagement
         if day in ['Tuesday', 'Wednesday', 'Thursday']:
@@ -80,9 +125,6 @@ class PostingScheduler:
         Returns:
             List[Dict]: List of recommended time slots
         """
-        # Start with base slots
-        recommended_slots = self.time_slots.copy()
-        
         # Apply sentiment adjustment
         overall_sentiment = sentiment_results.get('overall_sentiment', 0)
         sentiment_adjustment = overall_sentiment * 0.2  # Sentiment contributes 20%
@@ -92,31 +134,31 @@ class PostingScheduler:
         if engagement_history:
             history_adjustment = self._calculate_history_adjustment(engagement_history)
         
-        # Calculate final scores for each slot
-        for slot in recommended_slots:
-            # Combine base engagement, sentiment, and history
-            final_score = (
-                slot['base_engagement'] * 0.6 +
-                sentiment_adjustment * 0.3 +
-                history_adjustment * 0.1 +
-                random.uniform(-0.05, 0.05)  # Small random variation
-            )
-            
-            # Ensure score is within bounds
-            slot['score'] = max(0.1, min(0.99, final_score))
-            slot['sentiment_adjustment'] = sentiment_adjustment
-        
-        # Sort by score and return top recommendations
-        recommended_slots.sort(key=lambda x: x['score'], reverse=True)
+        # Combine base engagement, sentiment, history and a small random
+        # variation for all slots at once, keeping scores within bounds
+        scores = np.clip(
+            self.base * 0.6 +
+            sentiment_adjustment * 0.3 +
+            history_adjustment * 0.1 +
+            self._rng.uniform(-0.05, 0.05, size=self.base.size),
+            0.1, 0.99
+        )
+        
+        # Select the top 5 slots by partitioning, then order just those
+        k = min(5, scores.size)
+        top_idx = np.argpartition(-scores, k - 1)[:k]
+        top_idx = top_idx[np.argsort(-scores[top_idx])]
         
         # Format and return top 5 slots
+        top_scores = scores[top_idx]
+        text_idx = np.searchsorted(self._THRESHOLDS, top_scores, side='right')
         top_slots = []
-        for slot in recommended_slots[:5]:
+        for i, score, t in zip(top_idx, top_scores.tolist(), text_idx.tolist()):
             top_slots.append({
-                'day': slot['day'],
-                'time': slot['time_range'],
-                'score': round(slot['score'], 3),
-                'recommendation': self._get_recommendation_text(slot['score'])
+                'day': str(self.days[i]),
+                'time': str(self.time_ranges[i]),
+                'score': round(score, 3),
+                'recommendation': self._TEXTS[t]
             })
         
         return top_slots
@@ -126,38 +168,33 @@ class PostingScheduler:
         if not engagement_history:
             return 0.0
         
+        # Extract hour and engagement columns, skipping records without a value for either
+        rows = [
+            (h.get('hour_of_day'), h.get('estimated_engagement'))
+            for h in engagement_history
+            if h.get('hour_of_day') not in _BLANK and h.get('estimated_engagement') not in _BLANK
+        ]
+        if not rows:
+            return 0.5
+        
         try:
-            # Convert to DataFrame for analysis
-            df = pd.DataFrame(engagement_history)
-            
-            # Calculate average engagement for similar times
-            current_hour = datetime.now().hour
-            current_weekday = datetime.now().weekday()
-            
-            # Filter for similar times (within 2 hours)
-            similar_times = df[
-                abs(df['hour_of_day'] - current_hour) <= 2
-            ]
-            
-            if not similar_times.empty:
-                return float(similar_times['estimated_engagement'].mean())
-            
-            return 0.5  # Default if no similar times found
-            
-        except Exception as e:
-            print(f"Error calculating history adjustment: {e}")
+            columns = np.array(rows, dtype=np.float64)
+        except (TypeError, ValueError) as e:
+            logger.warning("Error calculating history adjustment: %s", e)
             return 0.5
+        hours, engagement = columns[:, 0], columns[:, 1]
+        
+        # Average engagement for similar times (within 2 hours)
+        mask = np.abs(hours - _current_hour()) <= 2
+        
+        if mask.any():
+            return float(engagement[mask].mean())
+        
+        return 0.5  # Default if no similar times found
     
     def _get_recommendation_text(self, score: float) -> str:
         """Get recommendation text based on score."""
-        if score >= 0.8:
-            return "Excellent time to post - high expected engagement"
-        elif score >= 0.7:
-            return "Good time to post - above average engagement expected"
-        elif score >= 0.6:
-            return "Moderate time - average engagement expected"
-        else:
-            return "Lower priority - consider other time slots first"
+        return self._TEXTS[int(np.searchsorted(self._THRESHOLDS, score, side='right'))]
     
     def get_time_slot_insights(self, sentiment_results: Dict) -> List[str]:
         """Generate insights about posting times based on sentiment."""
@@ -3,11 +3,178 @@ Module for sentiment analysis using Gemini API.
 Handles AI interactions and sentiment processing.
 """
 
-import google.generativeai as genai
+import asyncio
+import hashlib
 import json
-from typing import List, Dict, Any
+import threading
+from typing import List, Dict, Any, FrozenSet, Optional, Tuple
 import re
-from collections import Counter
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # Optional; falls back to the stdlib json module
+    orjson = None
+
+
+# Sentiment keywords for the rule-based fallback
+_POSITIVE_WORDS = frozenset([
+    'great', 'excellent', 'good', 'positive', 'success', 'growth',
+    'profit', 'innovation', 'opportunity', 'improve', 'increase'
+])
+
+_NEGATIVE_WORDS = frozenset([
+    'bad', 'poor', 'negative', 'failure', 'decline', 'loss',
+    'problem', 'issue', 'challenge', 'difficult', 'risk'
+])
+
+_SENTIMENT_WORDS = _POSITIVE_WORDS | _NEGATIVE_WORDS
+
+# Alphabetic tokens of 3+ letters; the shortest sentiment keyword ('bad') has 3
+_TOKEN_RE = re.compile(r"[a-z]{3,}")
+
+# Words never reported as topics
+_STOP_WORDS = frozenset(['the', 'and', 'for', 'with', 'this', 'that', 'are', 'was'])
+
+
+# Static parts of the sentiment analysis prompt; the numbered tweets go between them
+_PROMPT_PREFIX = """Analyze the sentiment of these business-related tweets and provide insights.
+
+Tweets:
+"""
+
+_PROMPT_SUFFIX = """
+
+Please provide a JSON response with the following structure:
+{
+    "overall_sentiment": float (-1.0 to 1.0),
+    "sentiment_distribution": {
+        "positive": float (0.0 to 1.0),
+        "neutral": float (0.0 to 1.0),
+        "negative": float (0.0 to 1.0)
+    },
+    "positive_topics": ["topic1", "topic2", "topic3"],
+    "negative_topics": ["topic1", "topic2"],
+    "key_insights": ["insight1", "insight2", "insight3"]
+}
+
+Return ONLY valid JSON, no additional text.
+"""
+
+# Body of the first Markdown code fence (optionally tagged json) in a response
+_FENCE_RE = re.compile(r'```(?:json)?\s*([\s\S]*?)(?:```|\Z)')
+
+# Maximum number of Gemini responses kept in the in-memory cache
+_RESPONSE_CACHE_SIZE = 256
+
+# Maximum number of Gemini requests analyze_many keeps in flight at once
+_MAX_CONCURRENT_REQUESTS = 8
+
+# Event loop shared by every analyze_sentiment_batches call, started on first use
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    """
+    Return the shared event loop, starting it in a daemon thread on first use.
+    
+    The Gemini SDK's async client is bound to the loop it first runs on, so
+    every synchronous batch call is funnelled through this one loop instead
+    of a fresh asyncio.run loop each time.
+    """
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="sentiment-async", daemon=True).start()
+            _loop = loop
+    return _loop
+
+
+@lru_cache(maxsize=4096)
+def _keywords_in(token: str) -> FrozenSet[str]:
+    """Return the sentiment keywords contained in a token ('challenges' -> {'challenge'})."""
+    return frozenset(word for word in _SENTIMENT_WORDS if word in token)
+
+
+@dataclass
+class SentimentResult:
+    """Sentiment fields of an AI response, validated and clamped to their ranges."""
+    
+    # Declared by hand because dataclass(slots=True) needs Python 3.10
+    __slots__ = ('overall', 'dist', 'pos_topics', 'neg_topics')
+    
+    overall: float
+    dist: Tuple[float, float, float]  # (positive, neutral, negative), sums to 1
+    pos_topics: List[str]
+    neg_topics: List[str]
+    
+    @classmethod
+    def from_ai_result(cls, ai_result: Dict[str, Any]) -> "SentimentResult":
+        """
+        Build a result from parsed AI JSON.
+        
+        Raises:
+            ValueError, TypeError: If the response is not a JSON object, has no
+                usable sentiment distribution, holds non-numeric scores or
+                gives topics that are not lists
+        """
+        if not isinstance(ai_result, dict):
+            raise ValueError("AI response is not a JSON object")
+        
+        distribution = ai_result.get('sentiment_distribution')
+        if not isinstance(distribution, dict):
+            raise ValueError("sentiment_distribution is missing or not an object")
+        
+        dist = np.array([
+            distribution.get('positive', 0.0),
+            distribution.get('neutral', 0.0),
+            distribution.get('negative', 0.0)
+        ], dtype=np.float64)
+        dist = np.clip(np.nan_to_num(dist), 0.0, 1.0)
+        total = dist.sum()
+        if total <= 0:
+            raise ValueError("sentiment_distribution is all zero")
+        if not np.isclose(total, 1.0):
+            dist /= total
+        
+        overall = float(np.clip(np.nan_to_num(float(ai_result.get('overall_sentiment', 0.0))), -1.0, 1.0))
+        
+        return cls(
+            overall=overall,
+            dist=tuple(dist.tolist()),
+            pos_topics=cls._topics(ai_result, 'positive_topics'),
+            neg_topics=cls._topics(ai_result, 'negative_topics')
+        )
+    
+    @staticmethod
+    def _topics(ai_result: Dict[str, Any], key: str) -> List[str]:
+        """Return the topic list under key; a missing or null entry means no topics."""
+        topics = ai_result.get(key)
+        if topics is None:
+            return []
+        if not isinstance(topics, list):
+            raise ValueError(f"{key} is not a list")
+        return [str(t) for t in topics]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the fields in the sentiment results dict layout used by callers."""
+        positive, neutral, negative = self.dist
+        return {
+            'overall_sentiment': self.overall,
+            'sentiment_distribution': {
+                'positive': positive,
+                'neutral': neutral,
+                'negative': negative
+            },
+            'positive_topics': list(self.pos_topics),
+            'negative_topics': list(self.neg_topics)
+        }
 
 
 class SentimentAnalyzer:
@@ -23,12 +190,19 @@ class SentimentAnalyzer:
         self.config = config
         self.client = self._initialize_gemini_client()
         self.model_name = "gemini-2.0-flash-exp"
+        self._response_cache: "OrderedDict[bytes, str]" = OrderedDict()
+        # Guards _response_cache, which the background loop and script threads share
+        self._cache_lock = threading.Lock()
+        # Gemini requests in flight on the event loop, keyed by response cache key
+        self._inflight: Dict[bytes, "asyncio.Future[str]"] = {}
     
     def _initialize_gemini_client(self):
         """Initialize and return Gemini AI client."""
         try:
-            api_key = self.config.get('GEMINI_API_KEY')
-            if api_key and api_key != 'YOUR_GEMINI_API_KEY':
+            api_key = self.config.settings.gemini_token
+            if api_key:
+                # Imported here so the rule-based fallback never loads the SDK
+                import google.generativeai as genai
                 genai.configure(api_key=api_key)
                 return genai
             return None
@@ -46,68 +220,165 @@ class SentimentAnalyzer:
         Returns:
             Dict: Sentiment analysis results
         """
-        if not tweets:
-            return self._get_default_sentiment()
-        
-        # If no Gemini client, use rule-based fallback
-        if not self.client:
-            return self._rule_based_sentiment_analysis(tweets)
+        result = self._offline_result(tweets)
+        if result is not None:
+            return result
         
         try:
-            # Prepare tweets for analysis
-            tweet_texts = [tweet['text'] for tweet in tweets[:10]]
-            analysis_prompt = self._create_analysis_prompt(tweet_texts)
+            tweet_texts, cache_key, response_text = self._prepare_request(tweets)
+            if response_text is None:
+                response_text = self._generate_response(tweet_texts)
+            
+            # Parse response; only replies that parse are cached
+            return self._parse_ai_response(response_text, tweets, cache_key)
+            
+        except Exception as e:
+            return self._api_error_fallback(e, tweets)
+    
+    async def analyze_sentiment_batch_async(self, tweets: List[Dict]) -> Dict[str, Any]:
+        """
+        Analyze sentiment for a batch of tweets without blocking on the API call.
+        
+        Args:
+            tweets (List[Dict]): List of tweet dictionaries
             
-            # Call Gemini API
-            model = self.client.GenerativeModel(self.model_name)
-            response = model.generate_content(analysis_prompt)
+        Returns:
+            Dict: Sentiment analysis results
+        """
+        result = self._offline_result(tweets)
+        if result is not None:
+            return result
+        
+        try:
+            tweet_texts, cache_key, response_text = self._prepare_request(tweets)
+            if response_text is None:
+                response_text = await self._shared_response_async(tweet_texts, cache_key)
             
-            # Parse response
-            return self._parse_ai_response(response.text, tweets)
+            # Parse response; only replies that parse are cached
+            return self._parse_ai_response(response_text, tweets, cache_key)
             
         except Exception as e:
-            print(f"Error in AI sentiment analysis: {e}")
+            return self._api_error_fallback(e, tweets)
+    
+    async def analyze_many(self, tweet_lists: List[List[Dict]]) -> List[Dict[str, Any]]:
+        """
+        Analyze several tweet batches with their API calls in flight concurrently.
+        
+        At most _MAX_CONCURRENT_REQUESTS batches are analyzed at a time.
+        
+        Args:
+            tweet_lists (List[List[Dict]]): Batches of tweet dictionaries
+            
+        Returns:
+            List[Dict]: Sentiment analysis results, one per batch in input order
+        """
+        semaphore = asyncio.Semaphore(_MAX_CONCURRENT_REQUESTS)
+        
+        async def analyze_limited(tweets: List[Dict]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.analyze_sentiment_batch_async(tweets)
+        
+        return list(await asyncio.gather(*(analyze_limited(tweets) for tweets in tweet_lists)))
+    
+    def analyze_sentiment_batches(self, tweet_lists: List[List[Dict]]) -> List[Dict[str, Any]]:
+        """Synchronous wrapper around analyze_many; runs it on the shared background event loop."""
+        future = asyncio.run_coroutine_threadsafe(self.analyze_many(tweet_lists), _background_loop())
+        return future.result()
+    
+    def _offline_result(self, tweets: List[Dict]) -> Optional[Dict[str, Any]]:
+        """Return the result for a batch that needs no API call, or None if Gemini should be asked."""
+        if not tweets:
+            return self._get_default_sentiment()
+        
+        # If no Gemini client, use rule-based fallback
+        if not self.client:
             return self._rule_based_sentiment_analysis(tweets)
+        
+        return None
+    
+    def _prepare_request(self, tweets: List[Dict]) -> Tuple[List[str], Optional[bytes], Optional[str]]:
+        """Return (tweet texts to send, cache key, cached response text or None) for a batch."""
+        tweet_texts = [tweet['text'] for tweet in tweets[:10]]
+        cache_key, cached = self._lookup_response(tweet_texts)
+        return tweet_texts, cache_key, cached
+    
+    def _api_error_fallback(self, error: Exception, tweets: List[Dict]) -> Dict[str, Any]:
+        """Report a failed AI analysis and fall back to rule-based results."""
+        print(f"Error in AI sentiment analysis: {error}")
+        return self._rule_based_sentiment_analysis(tweets)
+    
+    def _generate_response(self, tweet_texts: List[str]) -> str:
+        """Return Gemini's response text for a batch."""
+        analysis_prompt = self._create_analysis_prompt(tweet_texts)
+        model = self.client.GenerativeModel(self.model_name)
+        return model.generate_content(analysis_prompt).text
+    
+    async def _generate_response_async(self, tweet_texts: List[str]) -> str:
+        """Async counterpart of _generate_response."""
+        analysis_prompt = self._create_analysis_prompt(tweet_texts)
+        model = self.client.GenerativeModel(self.model_name)
+        return (await model.generate_content_async(analysis_prompt)).text
+    
+    async def _shared_response_async(self, tweet_texts: List[str], cache_key: Optional[bytes]) -> str:
+        """Return Gemini's response text, sharing one in-flight request between identical batches."""
+        if cache_key is None:
+            return await self._generate_response_async(tweet_texts)
+        
+        future = self._inflight.get(cache_key)
+        if future is None:
+            future = asyncio.ensure_future(self._generate_response_async(tweet_texts))
+            self._inflight[cache_key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(cache_key, None))
+        
+        # Shielded so one cancelled caller does not cancel the request for the others
+        return await asyncio.shield(future)
+    
+    def _lookup_response(self, tweet_texts: List[str]) -> Tuple[Optional[bytes], Optional[str]]:
+        """Return (cache key, cached response text); the key is None when caching is disabled."""
+        if not self.config.settings.enable_response_cache:
+            return None, None
+        
+        cache_key = self._response_cache_key(tweet_texts)
+        with self._cache_lock:
+            cached = self._response_cache.get(cache_key)
+            if cached is not None:
+                self._response_cache.move_to_end(cache_key)
+        return cache_key, cached
+    
+    def _store_response(self, cache_key: Optional[bytes], response_text: str):
+        """Cache a response text, evicting the least recently used entry when full."""
+        if cache_key is None:
+            return
+        
+        with self._cache_lock:
+            self._response_cache[cache_key] = response_text
+            if len(self._response_cache) > _RESPONSE_CACHE_SIZE:
+                self._response_cache.popitem(last=False)
+    
+    def _response_cache_key(self, tweet_texts: List[str]) -> bytes:
+        """Hash a batch of tweet texts, ignoring order and case."""
+        normalized = "\n".join(sorted(text.lower() for text in tweet_texts))
+        return hashlib.blake2b(normalized.encode(), digest_size=16).digest()
     
     def _create_analysis_prompt(self, tweet_texts: List[str]) -> str:
         """Create prompt for sentiment analysis."""
-        tweets_str = "\n".join([f"{i+1}. {text}" for i, text in enumerate(tweet_texts)])
-        
-        prompt = f"""
-        Analyze the sentiment of these business-related tweets and provide insights.
-        
-        Tweets:
-        {tweets_str}
-        
-        Please provide a JSON response with the following structure:
-        {{
-            "overall_sentiment": float (-1.0 to 1.0),
-            "sentiment_distribution": {{
-                "positive": float (0.0 to 1.0),
-                "neutral": float (0.0 to 1.0),
-                "negative": float (0.0 to 1.0)
-            }},
-            "positive_topics": ["topic1", "topic2", "topic3"],
-            "negative_topics": ["topic1", "topic2"],
-            "key_insights": ["insight1", "insight2", "insight3"]
-        }}
-        
-        Return ONLY valid JSON, no additional text.
-        """
-        
-        return prompt
+        tweets_str = "\n".join(f"{i}. {text}" for i, text in enumerate(tweet_texts, 1))
+        return f"{_PROMPT_PREFIX}{tweets_str}{_PROMPT_SUFFIX}"
     
-    def _parse_ai_response(self, response_text: str, tweets: List[Dict]) -> Dict[str, Any]:
-        """Parse AI response and combine with tweet data."""
+    def _parse_ai_response(self, response_text: str, tweets: List[Dict],
+                           cache_key: Optional[bytes] = None) -> Dict[str, Any]:
+        """Parse AI response and combine with tweet data, caching it under cache_key if valid."""
         try:
             # Extract JSON from response
-            json_str = response_text
-            if '```json' in response_text:
-                json_str = response_text.split('```json')[1].split('```')[0]
-            elif '```' in response_text:
-                json_str = response_text.split('```')[1].split('```')[0]
+            match = _FENCE_RE.search(response_text)
+            json_str = match.group(1) if match else response_text
+            
+            ai_result = orjson.loads(json_str) if orjson is not None else json.loads(json_str)
             
-            ai_result = json.loads(json_str)
+            # Validate and clamp the model's scores before anything uses them
+            validated = SentimentResult.from_ai_result(ai_result)
+            ai_result.update(validated.to_dict())
+            self._store_response(cache_key, response_text)
             
             # Enhance with engagement data
             avg_engagement = sum(t.get('engagement_score', 0) for t in tweets) / len(tweets) if tweets else 0
@@ -116,7 +387,7 @@ class SentimentAnalyzer:
             
             return ai_result
             
-        except json.JSONDecodeError as e:
+        except (TypeError, ValueError) as e:  # Includes json.JSONDecodeError
             print(f"Error parsing AI response: {e}")
             return self._rule_based_sentiment_analysis(tweets)
     
@@ -125,73 +396,62 @@ class SentimentAnalyzer:
         if not tweets:
             return self._get_default_sentiment()
         
-        # Define sentiment keywords
-        positive_words = [
-            'great', 'excellent', 'good', 'positive', 'success', 'growth',
-            'profit', 'innovation', 'opportunity', 'improve', 'increase'
-        ]
-        
-        negative_words = [
-            'bad', 'poor', 'negative', 'failure', 'decline', 'loss',
-            'problem', 'issue', 'challenge', 'difficult', 'risk'
-        ]
-        
-        # Analyze each tweet
-        sentiments = []
+        # Analyze all tweets in a single pass
+        n_pos = n_neu = n_neg = 0
+        total_engagement = 0.0
         all_words = []
         
         for tweet in tweets:
-            text = tweet['text'].lower()
+            tokens = _TOKEN_RE.findall(tweet['text'].lower())
+            all_words.extend(tokens)
+            total_engagement += tweet.get('engagement_score', 0)
             
-            pos_count = sum(1 for word in positive_words if word in text)
-            neg_count = sum(1 for word in negative_words if word in text)
+            # Keywords found in any token, so inflections like 'risks' still count
+            matched = frozenset().union(*map(_keywords_in, set(tokens)))
+            pos_count = len(matched & _POSITIVE_WORDS)
+            neg_count = len(matched & _NEGATIVE_WORDS)
             
             if pos_count > neg_count:
-                sentiments.append(1.0)
+                n_pos += 1
             elif neg_count > pos_count:
-                sentiments.append(-1.0)
+                n_neg += 1
             else:
-                sentiments.append(0.0)
-            
-            all_words.extend(text.split())
+                n_neu += 1
         
-        # Calculate overall sentiment
-        if sentiments:
-            overall = sum(sentiments) / len(sentiments)
-            
-            # Calculate distribution
-            pos_count = sum(1 for s in sentiments if s > 0)
-            neu_count = sum(1 for s in sentiments if s == 0)
-            neg_count = sum(1 for s in sentiments if s < 0)
-            total = len(sentiments)
-            
-            return {
-                'overall_sentiment': overall,
-                'sentiment_distribution': {
-                    'positive': pos_count / total,
-                    'neutral': neu_count / total,
-                    'negative': neg_count / total
-                },
-                'positive_topics': self._extract_topics(all_words, positive_words)[:3],
-                'negative_topics': self._extract_topics(all_words, negative_words)[:2],
-                'key_insights': [
-                    "Consider timing posts around positive trend discussions",
-                    "Monitor mentions of challenges for proactive responses"
-                ],
-                'average_engagement': sum(t.get('engagement_score', 0) for t in tweets) / len(tweets),
-                'tweets_analyzed': len(tweets)
-            }
-        
-        return self._get_default_sentiment()
-    
-    def _extract_topics(self, words: List[str], sentiment_words: List[str]) -> List[str]:
+        # Calculate overall sentiment and distribution
+        total = len(tweets)
+        overall = (n_pos - n_neg) / total
+        pos_frac = n_pos / total
+        neu_frac = n_neu / total
+        neg_frac = n_neg / total
+        
+        return {
+            'overall_sentiment': overall,
+            'sentiment_distribution': {
+                'positive': pos_frac,
+                'neutral': neu_frac,
+                'negative': neg_frac
+            },
+            'positive_topics': self._extract_topics(all_words, _POSITIVE_WORDS)[:3],
+            'negative_topics': self._extract_topics(all_words, _NEGATIVE_WORDS)[:2],
+            'key_insights': [
+                "Consider timing posts around positive trend discussions",
+                "Monitor mentions of challenges for proactive responses"
+            ],
+            'average_engagement': total_engagement / total,
+            'tweets_analyzed': total
+        }
+    
+    def _extract_topics(self, words: List[str], sentiment_words: FrozenSet[str]) -> List[str]:
         """Extract common topics from words."""
-        # Filter for meaningful words
-        stop_words = {'the', 'and', 'for', 'with', 'this', 'that', 'are', 'was'}
-        meaningful = [w for w in words if len(w) > 3 and w not in stop_words and w in sentiment_words]
+        if not isinstance(sentiment_words, frozenset):
+            sentiment_words = frozenset(sentiment_words)
         
-        # Count occurrences
-        word_counts = Counter(meaningful)
+        # Count occurrences of meaningful words, filtered lazily
+        word_counts = Counter(
+            w for w in words
+            if len(w) > 3 and w not in _STOP_WORDS and w in sentiment_words
+        )
         return [word for word, count in word_counts.most_common(5)]
     
     def generate_content_ideas(self, sentiment_results: Dict, hashtag: str) -> List[str]: